@@ -0,0 +1,84 @@
+"""
+Greedy nearest-neighbour matching of tracked objects to new detections.
+
+Kept apart from tracker.py so the optional numba dependency and its
+JIT-compiled kernel stay out of the tracker's bookkeeping code.
+"""
+
+import numpy as np
+
+try:
+    import numba as nb
+except ImportError:  # numba is optional – fall back to the NumPy matcher
+    nb = None
+
+
+# ---------------------------------------------------------------------------
+# Assignment – greedy nearest-neighbour matching of tracks to detections
+# ---------------------------------------------------------------------------
+def _greedy_assignments(obj_xy: np.ndarray, new_xy: np.ndarray,
+                        max_dist2: float) -> tuple[np.ndarray, np.ndarray]:
+    """NumPy matcher: returns matched (row_idx, col_idx) pairs."""
+    # Squared distances only – the gate is compared against max_dist2, so the
+    # sqrt would be wasted work.
+    diff = obj_xy[:, None, :] - new_xy[None, :, :]
+    D = (diff * diff).sum(-1)
+
+    # Greedy assignment (rows = existing, cols = new detections)
+    rows = D.min(axis=1).argsort(kind="stable")
+    cols = D.argmin(axis=1)[rows]
+
+    used_cols = np.zeros(new_xy.shape[0], dtype=bool)
+    row_idx: list[int] = []
+    col_idx: list[int] = []
+
+    for row, col in zip(rows, cols):
+        if used_cols[col] or D[row, col] > max_dist2:
+            continue
+        used_cols[col] = True
+        row_idx.append(row)
+        col_idx.append(col)
+
+    return np.array(row_idx, dtype=np.intp), np.array(col_idx, dtype=np.intp)
+
+
+if nb is not None:
+    @nb.njit(fastmath=True, cache=True)
+    def compute_assignments(obj_xy, new_xy, max_dist2):
+        """Fused squared-distance + row argmin + greedy matching, no D matrix."""
+        n = obj_xy.shape[0]
+        m = new_xy.shape[0]
+        best_d2 = np.empty(n, dtype=np.float32)
+        best_col = np.empty(n, dtype=np.intp)
+
+        for i in range(n):
+            dx = obj_xy[i, 0] - new_xy[0, 0]
+            dy = obj_xy[i, 1] - new_xy[0, 1]
+            bd = dx * dx + dy * dy
+            bc = 0
+            for j in range(1, m):
+                dx = obj_xy[i, 0] - new_xy[j, 0]
+                dy = obj_xy[i, 1] - new_xy[j, 1]
+                d2 = dx * dx + dy * dy
+                if d2 < bd:
+                    bd = d2
+                    bc = j
+            best_d2[i] = bd
+            best_col[i] = bc
+
+        used_cols = np.zeros(m, dtype=np.bool_)
+        row_idx = np.empty(n, dtype=np.intp)
+        col_idx = np.empty(n, dtype=np.intp)
+        k = 0
+        for row in np.argsort(best_d2, kind="mergesort"):
+            col = best_col[row]
+            if used_cols[col] or best_d2[row] > max_dist2:
+                continue
+            used_cols[col] = True
+            row_idx[k] = row
+            col_idx[k] = col
+            k += 1
+
+        return row_idx[:k], col_idx[:k]
+else:
+    compute_assignments = _greedy_assignments
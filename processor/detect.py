@@ -5,6 +5,7 @@ Processes a video file and counts items crossing a configurable counting line.
 
 Usage:
     python detect.py <video_path> [--output <output_path>] [--line-pos 0.5]
+                     [--detect-stride 1]
 
 Outputs:
     - Annotated video saved to <output_path> (default: uploads/<name>_processed.mp4)
@@ -15,95 +16,316 @@ import sys
 import os
 import json
 import argparse
+import functools
+import queue
+import shutil
+import subprocess
+import threading
+from fractions import Fraction
 import cv2
 import numpy as np
 
+from tracker import MAX_MATCH_DIST, CentroidTracker, LineCounter
+
+try:
+    import av
+except ImportError:  # PyAV is optional – fall back to an ffmpeg subprocess
+    av = None
+
+
+# Make sure OpenCV's SIMD (SSE/AVX/NEON) kernels are enabled and its own
+# parallel loops may use every core.
+cv2.setUseOptimized(True)
+cv2.setNumThreads(cv2.getNumberOfCPUs())
+
+MASK_SCALE = 2  # foreground mask is computed at 1/MASK_SCALE of the frame size
+CLOSE_KERNEL = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
+DILATE_KERNEL = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+BLUR_KSIZE = (5, 5)  # Gaussian pre-blur on the grayscale, downscaled frame
+BG_HISTORY = 500  # MOG2 background model length, in frames
+
+
+# ---------------------------------------------------------------------------
+# Foreground mask – blur, MOG2 and morphology on a downscaled frame
+# ---------------------------------------------------------------------------
+def _create_bg_subtractor(factory, history: int):
+    # No shadow detection: the mask is already 0/255
+    return factory(history=history, varThreshold=50, detectShadows=False)
+
+
+class MaskExtractor:
+    """Foreground mask on the CPU, or on OpenCL through OpenCV's T-API."""
+
+    def __init__(self, mask_size: tuple[int, int], history: int = BG_HISTORY):
+        self.mask_size = mask_size
+        self.bg_subtractor = _create_bg_subtractor(cv2.createBackgroundSubtractorMOG2, history)
+
+        # Per-frame buffers, allocated once and reused through dst=
+        mask_w, mask_h = mask_size
+        self.small_buf = cv2.UMat(mask_h, mask_w, cv2.CV_8UC3)
+        self.gray_buf = cv2.UMat(mask_h, mask_w, cv2.CV_8UC1)
+        self.blur_buf = cv2.UMat(mask_h, mask_w, cv2.CV_8UC1)
+        self.fg_buf = cv2.UMat(mask_h, mask_w, cv2.CV_8UC1)
+        self.morph_buf = cv2.UMat(mask_h, mask_w, cv2.CV_8UC1)
+        self.labels_buf = np.empty((mask_h, mask_w), dtype=np.int32)
+
+    def apply(self, frame: np.ndarray) -> cv2.UMat:
+        # Buffers are UMat so the T-API can dispatch every kernel to OpenCL
+        # (plain CPU path when no device is present).
+        cv2.resize(cv2.UMat(frame), self.mask_size, dst=self.small_buf,
+                   interpolation=cv2.INTER_AREA)
+        # MOG2 works fine on one channel: a third of the bytes for the blur
+        # and the background model update.
+        cv2.cvtColor(self.small_buf, cv2.COLOR_BGR2GRAY, dst=self.gray_buf)
+        cv2.GaussianBlur(self.gray_buf, BLUR_KSIZE, 0, dst=self.blur_buf)
+        self.bg_subtractor.apply(self.blur_buf, fgmask=self.fg_buf)
+
+        # Morphology to clean noise: one wider close fills holes, the
+        # dilation merges fragments; leftover specks fall under min_area
+        cv2.morphologyEx(self.fg_buf, cv2.MORPH_CLOSE, CLOSE_KERNEL, dst=self.morph_buf)
+        cv2.dilate(self.morph_buf, DILATE_KERNEL, dst=self.fg_buf, iterations=2)
+        return self.fg_buf
+
+    def blobs(self, frame: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Stats and centroids of the mask's connected components (label 0 = background)."""
+        # OpenCV has no device-side labelling on the T-API path, so the uint8
+        # mask is downloaded once here and labelled into a host buffer.
+        _, _, stats, centroids = cv2.connectedComponentsWithStats(
+            self.apply(frame).get(), labels=self.labels_buf, connectivity=8)
+        return stats, centroids
+
+
+class CudaMaskExtractor:
+    """Same pipeline on a CUDA device; only the final mask is downloaded."""
+
+    def __init__(self, mask_size: tuple[int, int], history: int = BG_HISTORY):
+        self.mask_size = mask_size
+        self.stream = cv2.cuda.Stream()
+        self.bg_subtractor = _create_bg_subtractor(cv2.cuda.createBackgroundSubtractorMOG2,
+                                                   history)
+        self.gaussian = cv2.cuda.createGaussianFilter(cv2.CV_8UC1, cv2.CV_8UC1, BLUR_KSIZE, 0)
+        self.close = cv2.cuda.createMorphologyFilter(cv2.MORPH_CLOSE, cv2.CV_8UC1, CLOSE_KERNEL)
+        self.dilate = cv2.cuda.createMorphologyFilter(cv2.MORPH_DILATE, cv2.CV_8UC1,
+                                                      DILATE_KERNEL, iterations=2)
+
+        # Device buffers, allocated on first use and reused afterwards
+        self.frame_buf = cv2.cuda.GpuMat()
+        self.small_buf = cv2.cuda.GpuMat()
+        self.gray_buf = cv2.cuda.GpuMat()
+        self.blur_buf = cv2.cuda.GpuMat()
+        self.fg_buf = cv2.cuda.GpuMat()
+        self.morph_buf = cv2.cuda.GpuMat()
+
+        # Host buffers for the mask download and its labelling.
+        # cv2.cuda.connectedComponents only returns a 4-byte label image, so
+        # the uint8 mask is the smallest thing worth bringing back.
+        mask_w, mask_h = mask_size
+        self.host_mask = np.empty((mask_h, mask_w), dtype=np.uint8)
+        self.labels_buf = np.empty((mask_h, mask_w), dtype=np.int32)
+
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        stream = self.stream
+        self.frame_buf.upload(frame, stream)
+        cv2.cuda.resize(self.frame_buf, self.mask_size, dst=self.small_buf,
+                        interpolation=cv2.INTER_AREA, stream=stream)
+        cv2.cuda.cvtColor(self.small_buf, cv2.COLOR_BGR2GRAY, dst=self.gray_buf, stream=stream)
+        self.gaussian.apply(self.gray_buf, dst=self.blur_buf, stream=stream)
+        self.bg_subtractor.apply(self.blur_buf, -1, stream, fgmask=self.fg_buf)
+        self.close.apply(self.fg_buf, dst=self.morph_buf, stream=stream)
+        self.dilate.apply(self.morph_buf, dst=self.fg_buf, stream=stream)
+
+        self.fg_buf.download(stream, self.host_mask)
+        stream.waitForCompletion()
+        return self.host_mask
+
+    def blobs(self, frame: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Stats and centroids of the mask's connected components (label 0 = background)."""
+        _, _, stats, centroids = cv2.connectedComponentsWithStats(
+            self.apply(frame), labels=self.labels_buf, connectivity=8)
+        return stats, centroids
+
+
+def create_mask_extractor(mask_size: tuple[int, int], history: int = BG_HISTORY):
+    """Use the CUDA pipeline when a CUDA device is available, else the T-API one."""
+    if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+        try:
+            return CudaMaskExtractor(mask_size, history)
+        except (AttributeError, cv2.error):
+            # CUDA core without the cudabgsegm/cudafilters/cudawarping modules
+            pass
+    return MaskExtractor(mask_size, history)
+
 
 # ---------------------------------------------------------------------------
-# Tracker – simple centroid tracker to avoid double-counting
+# Output – H.264 through PyAV or ffmpeg (NVENC when available), mp4v fallback
 # ---------------------------------------------------------------------------
-class CentroidTracker:
-    """Track objects by centroid proximity across frames."""
-
-    def __init__(self, max_disappeared: int = 15):
-        self.next_id = 0
-        self.objects: dict[int, tuple[int, int]] = {}
-        self.disappeared: dict[int, int] = {}
-        self.max_disappeared = max_disappeared
-
-    def register(self, centroid: tuple[int, int]) -> int:
-        obj_id = self.next_id
-        self.objects[obj_id] = centroid
-        self.disappeared[obj_id] = 0
-        self.next_id += 1
-        return obj_id
-
-    def deregister(self, obj_id: int):
-        del self.objects[obj_id]
-        del self.disappeared[obj_id]
-
-    def update(self, centroids: list[tuple[int, int]]) -> dict[int, tuple[int, int]]:
-        # No detections – mark all existing as disappeared
-        if len(centroids) == 0:
-            for obj_id in list(self.disappeared.keys()):
-                self.disappeared[obj_id] += 1
-                if self.disappeared[obj_id] > self.max_disappeared:
-                    self.deregister(obj_id)
-            return self.objects
-
-        # No existing objects – register all
-        if len(self.objects) == 0:
-            for c in centroids:
-                self.register(c)
-            return self.objects
-
-        obj_ids = list(self.objects.keys())
-        obj_centroids = list(self.objects.values())
-
-        # Compute distance matrix
-        D = np.zeros((len(obj_centroids), len(centroids)), dtype="float")
-        for i, oc in enumerate(obj_centroids):
-            for j, cc in enumerate(centroids):
-                D[i, j] = np.linalg.norm(np.array(oc) - np.array(cc))
-
-        # Greedy assignment (rows = existing, cols = new detections)
-        rows = D.min(axis=1).argsort()
-        cols = D.argmin(axis=1)[rows]
-
-        used_rows: set[int] = set()
-        used_cols: set[int] = set()
-
-        for row, col in zip(rows, cols):
-            if row in used_rows or col in used_cols:
-                continue
-            if D[row, col] > 80:  # max match distance (pixels)
-                continue
-            obj_id = obj_ids[row]
-            self.objects[obj_id] = centroids[col]
-            self.disappeared[obj_id] = 0
-            used_rows.add(row)
-            used_cols.add(col)
-
-        unused_rows = set(range(len(obj_centroids))) - used_rows
-        unused_cols = set(range(len(centroids))) - used_cols
-
-        for row in unused_rows:
-            obj_id = obj_ids[row]
-            self.disappeared[obj_id] += 1
-            if self.disappeared[obj_id] > self.max_disappeared:
-                self.deregister(obj_id)
-
-        for col in unused_cols:
-            self.register(centroids[col])
-
-        return self.objects
+H264_ENCODERS = ("h264_nvenc", "libx264")  # in order of preference
+
+
+def _encoder_options(codec: str) -> dict[str, str]:
+    if codec == "h264_nvenc":
+        return {"preset": "p1", "tune": "ll"}
+    return {"preset": "ultrafast"}
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_pyav_encoder() -> str | None:
+    """Return the first H.264 encoder PyAV can actually open, or None (cached)."""
+    if av is None:
+        return None
+    for codec in H264_ENCODERS:
+        try:
+            ctx = av.CodecContext.create(codec, "w")
+            ctx.width, ctx.height = 256, 256
+            ctx.pix_fmt = "yuv420p"
+            ctx.time_base = Fraction(1, 30)
+            ctx.open()
+        except (av.error.FFmpegError, ValueError):
+            continue
+        return codec
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_ffmpeg_encoder() -> str | None:
+    """Return the first H.264 encoder the ffmpeg CLI can actually open, or None (cached)."""
+    if shutil.which("ffmpeg") is None:
+        return None
+    for codec in H264_ENCODERS:
+        # Listed in `ffmpeg -encoders` doesn't mean usable (e.g. no GPU), so
+        # encode a few test frames instead.
+        probe = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error",
+             "-f", "lavfi", "-i", "color=size=256x256:duration=0.1",
+             "-c:v", codec, "-f", "null", "-"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        if probe.returncode == 0:
+            return codec
+    return None
+
+
+class PyAVWriter:
+    """Encode frames in-process with PyAV (VideoWriter-like API)."""
+
+    def __init__(self, output_path: str, codec: str, fps: float, width: int, height: int):
+        self.container = av.open(output_path, "w", options={"movflags": "+faststart"})
+        self.stream = self.container.add_stream(codec, rate=Fraction(fps).limit_denominator(1001))
+        self.stream.width = width
+        self.stream.height = height
+        self.stream.pix_fmt = "yuv420p"
+        self.stream.options = _encoder_options(codec)
+
+    def write(self, frame: np.ndarray):
+        video_frame = av.VideoFrame.from_ndarray(frame, format="bgr24")
+        self.container.mux(self.stream.encode(video_frame))
+
+    def release(self):
+        self.container.mux(self.stream.encode(None))  # flush delayed packets
+        self.container.close()
+
+
+class FfmpegWriter:
+    """Pipe raw BGR frames into an ffmpeg H.264 encoder (VideoWriter-like API)."""
+
+    def __init__(self, output_path: str, codec: str, fps: float, width: int, height: int):
+        options = [arg for key, value in _encoder_options(codec).items()
+                   for arg in (f"-{key}", value)]
+        self.proc = subprocess.Popen(
+            ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+             "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}",
+             "-r", str(fps), "-i", "-",
+             "-c:v", codec, *options, "-pix_fmt", "yuv420p",
+             "-movflags", "+faststart", output_path],
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+        )
+
+    def write(self, frame: np.ndarray):
+        self.proc.stdin.write(memoryview(np.ascontiguousarray(frame)))
+
+    def release(self):
+        try:
+            self.proc.stdin.close()
+        except BrokenPipeError:  # ffmpeg already exited; its code is reported below
+            pass
+        if self.proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with code {self.proc.returncode}")
+
+
+def open_writer(output_path: str, fps: float, width: int, height: int):
+    """Open the fastest available writer for the annotated output video."""
+    # yuv420p needs even dimensions; odd-sized input keeps the mp4v writer
+    if width % 2 == 0 and height % 2 == 0:
+        codec = _probe_pyav_encoder()
+        if codec is not None:
+            return PyAVWriter(output_path, codec, fps, width, height)
+        codec = _probe_ffmpeg_encoder()
+        if codec is not None:
+            return FfmpegWriter(output_path, codec, fps, width, height)
+    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+    return cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+
+
+# ---------------------------------------------------------------------------
+# Pipeline stages – decoding and encoding run on their own threads
+# ---------------------------------------------------------------------------
+QUEUE_SIZE = 8  # frames buffered between pipeline stages
+_END = None  # end-of-stream marker
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put item on q, giving up if the pipeline has been stopped."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event):
+    """Get the next item from q, or _END once the pipeline has been stopped."""
+    while True:
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            if stop.is_set():
+                return _END
+
+
+def _read_frames(cap, frames: queue.Queue, stop: threading.Event, errors: list):
+    """Reader stage: decode frames onto the queue as (frame_num, frame)."""
+    frame_num = 0
+    try:
+        while not stop.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frame_num += 1
+            if not _put(frames, (frame_num, frame), stop):
+                break
+    except Exception as exc:
+        errors.append(exc)
+    finally:
+        _put(frames, _END, stop)
+
+
+def _write_frames(writer, frames: queue.Queue, stop: threading.Event, errors: list):
+    """Writer stage: encode annotated frames until the end marker."""
+    try:
+        while (frame := _get(frames, stop)) is not _END:
+            writer.write(frame)
+    except Exception as exc:
+        errors.append(exc)
+        stop.set()
 
 
 # ---------------------------------------------------------------------------
 # Main processing pipeline
 # ---------------------------------------------------------------------------
 def process_video(video_path: str, output_path: str | None = None, line_position: float = 0.5,
-                  min_area: int = 1500, progress_callback=None):
+                  min_area: int = 1500, detect_stride: int = 1, progress_callback=None):
     """
     Process a video, count items crossing the counting line.
 
@@ -112,11 +334,15 @@ def process_video(video_path: str, output_path: str | None = None, line_position
         output_path:       Path to save annotated output video (optional).
         line_position:     Vertical position of the counting line as a fraction (0-1).
         min_area:          Minimum contour area (px²) to consider as an item.
+        detect_stride:     Run detection and tracking on every Nth frame only.
         progress_callback: Optional callable(frame_num, total_frames, current_count).
 
     Returns:
         dict with keys: count, output_path
     """
+    if detect_stride < 1:
+        raise ValueError(f"detect_stride must be >= 1, got {detect_stride}")
+
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         raise FileNotFoundError(f"Cannot open video: {video_path}")
@@ -129,95 +355,92 @@ def process_video(video_path: str, output_path: str | None = None, line_position
     # Counting line (horizontal)
     line_y = int(height * line_position)
 
-    # Output video writer
-    if output_path is None:
-        base, ext = os.path.splitext(video_path)
-        output_path = f"{base}_processed.mp4"
-    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-    writer = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-
-    # Background subtractor
-    bg_subtractor = cv2.createBackgroundSubtractorMOG2(
-        history=500, varThreshold=50, detectShadows=True
-    )
-
-    tracker = CentroidTracker(max_disappeared=int(fps * 0.5))
-    counted_ids: set[int] = set()  # IDs that already crossed the line
-    prev_positions: dict[int, int] = {}  # obj_id -> previous y
+    # Foreground mask resolution and the matching area threshold
+    mask_size = (width // MASK_SCALE, height // MASK_SCALE)
+    mask_min_area = min_area // (MASK_SCALE * MASK_SCALE)
+
+    # Detection only sees every detect_stride-th frame: objects move that
+    # much further between updates and disappear for fewer of them, and the
+    # background model needs that many fewer frames to adapt in the same time.
+    mask_extractor = create_mask_extractor(mask_size,
+                                           history=max(1, BG_HISTORY // detect_stride))
+    tracker = CentroidTracker(max_disappeared=max(1, int(fps * 0.5 / detect_stride)),
+                              max_distance=MAX_MATCH_DIST * detect_stride)
+    counter = LineCounter(line_y)
     item_count = 0
     frame_num = 0
+    boxes: list[list[int]] = []  # last detections as [x, y, w, h, cx, cy]
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        frame_num += 1
-
-        # ----- Pre-processing -----
-        blurred = cv2.GaussianBlur(frame, (11, 11), 0)
-        fg_mask = bg_subtractor.apply(blurred)
-
-        # Remove shadows (shadow pixels = 127 in MOG2)
-        _, fg_mask = cv2.threshold(fg_mask, 200, 255, cv2.THRESH_BINARY)
-
-        # Morphology to clean noise
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-        fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_CLOSE, kernel, iterations=2)
-        fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_OPEN, kernel, iterations=1)
-        fg_mask = cv2.dilate(fg_mask, kernel, iterations=2)
-
-        # ----- Contour detection -----
-        contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        centroids: list[tuple[int, int]] = []
-
-        for cnt in contours:
-            area = cv2.contourArea(cnt)
-            if area < min_area:
-                continue
-            x, y, w, h = cv2.boundingRect(cnt)
-            cx, cy = x + w // 2, y + h // 2
-            centroids.append((cx, cy))
-
-            # Draw bounding box
-            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-            cv2.circle(frame, (cx, cy), 4, (0, 0, 255), -1)
-
-        # ----- Tracking & counting -----
-        objects = tracker.update(centroids)
-
-        for obj_id, (cx, cy) in objects.items():
-            if obj_id in counted_ids:
-                continue
-
-            prev_y = prev_positions.get(obj_id)
-            if prev_y is not None:
-                # Check if the object crossed the line (either direction)
-                if (prev_y < line_y <= cy) or (prev_y > line_y >= cy):
-                    item_count += 1
-                    counted_ids.add(obj_id)
-
-            prev_positions[obj_id] = cy
-
-        # Clean prev_positions for deregistered objects
-        active_ids = set(objects.keys())
-        for oid in list(prev_positions.keys()):
-            if oid not in active_ids:
-                del prev_positions[oid]
-
-        # ----- Draw annotations -----
-        cv2.line(frame, (0, line_y), (width, line_y), (0, 0, 255), 2)
-        cv2.putText(frame, f"Count: {item_count}", (10, 40),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 255), 3)
-        cv2.putText(frame, "COUNTING LINE", (10, line_y - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
-
-        writer.write(frame)
-
-        if progress_callback and frame_num % 10 == 0:
-            progress_callback(frame_num, total_frames, item_count)
-
-    cap.release()
-    writer.release()
+    # Output video writer – opened last, since it may start an ffmpeg process
+    if output_path is None:
+        base, ext = os.path.splitext(video_path)
+        output_path = f"{base}_processed.mp4"
+    writer = open_writer(output_path, fps, width, height)
+
+    # Decode -> process -> encode: the reader and writer stages run on their
+    # own threads (OpenCV releases the GIL while decoding/encoding) and the
+    # processing stage runs here, so frame order is preserved.
+    stop = threading.Event()
+    errors: list[BaseException] = []
+    raw_frames: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+    out_frames: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+    stages = [
+        threading.Thread(target=_read_frames, args=(cap, raw_frames, stop, errors), daemon=True),
+        threading.Thread(target=_write_frames, args=(writer, out_frames, stop, errors), daemon=True),
+    ]
+    for stage in stages:
+        stage.start()
+
+    try:
+        while (item := _get(raw_frames, stop)) is not _END:
+            frame_num, frame = item
+
+            # Frames in between reuse the last detections for the overlay
+            if (frame_num - 1) % detect_stride == 0:
+                # ----- Foreground mask & blob detection -----
+                # The mask is computed on a downscaled copy; blobs are scaled
+                # back. One labelling pass yields every blob's box, area and
+                # centroid.
+                stats, blob_centroids = mask_extractor.blobs(frame)
+                keep = 1 + np.flatnonzero(stats[1:, cv2.CC_STAT_AREA] >= mask_min_area)
+                xywh = stats[keep, :cv2.CC_STAT_AREA] * MASK_SCALE
+                centroids = np.rint(blob_centroids[keep] * MASK_SCALE).astype(np.int32)
+                boxes = np.hstack([xywh, centroids]).tolist()
+
+                # ----- Tracking & counting -----
+                tracker.update(centroids)
+                item_count += counter.update(tracker)
+
+            # Draw bounding boxes
+            for x, y, w, h, cx, cy in boxes:
+                cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+                cv2.circle(frame, (cx, cy), 4, (0, 0, 255), -1)
+
+            # ----- Draw annotations -----
+            cv2.line(frame, (0, line_y), (width, line_y), (0, 0, 255), 2)
+            cv2.putText(frame, f"Count: {item_count}", (10, 40),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 255), 3)
+            cv2.putText(frame, "COUNTING LINE", (10, line_y - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+
+            if not _put(out_frames, frame, stop):
+                break
+
+            if progress_callback and frame_num % 10 == 0:
+                progress_callback(frame_num, total_frames, item_count)
+
+        _put(out_frames, _END, stop)
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        for stage in stages:
+            stage.join()
+        cap.release()
+        writer.release()
+
+    if errors:
+        raise errors[0]
 
     return {"count": item_count, "output_path": output_path, "total_frames": frame_num}
 
@@ -233,6 +456,8 @@ def main():
                         help="Counting line vertical position (0-1, default 0.5)")
     parser.add_argument("--min-area", type=int, default=1500,
                         help="Minimum contour area in pixels² (default 1500)")
+    parser.add_argument("--detect-stride", type=int, default=1,
+                        help="Run detection on every Nth frame only (default 1)")
     args = parser.parse_args()
 
     def on_progress(frame, total, count):
@@ -245,6 +470,7 @@ def main():
         output_path=args.output,
         line_position=args.line_pos,
         min_area=args.min_area,
+        detect_stride=args.detect_stride,
         progress_callback=on_progress,
     )
 
@@ -0,0 +1,164 @@
+"""
+Equivalence check: CentroidTracker + LineCounter against the original
+dict-based tracker and per-object counting loop from detect.py.
+
+Run with:  python -m pytest processor
+"""
+
+import numpy as np
+
+from tracker import MAX_MATCH_DIST, CentroidTracker, LineCounter
+
+
+class ReferenceTracker:
+    """The dict-based tracker detect.py used before the slot arrays."""
+
+    def __init__(self, max_disappeared: int):
+        self.next_id = 0
+        self.objects: dict[int, tuple[int, int]] = {}
+        self.disappeared: dict[int, int] = {}
+        self.max_disappeared = max_disappeared
+
+    def register(self, centroid: tuple[int, int]):
+        self.objects[self.next_id] = centroid
+        self.disappeared[self.next_id] = 0
+        self.next_id += 1
+
+    def deregister(self, obj_id: int):
+        del self.objects[obj_id]
+        del self.disappeared[obj_id]
+
+    def update(self, centroids: list[tuple[int, int]]) -> dict[int, tuple[int, int]]:
+        if len(centroids) == 0:
+            for obj_id in list(self.disappeared):
+                self.disappeared[obj_id] += 1
+                if self.disappeared[obj_id] > self.max_disappeared:
+                    self.deregister(obj_id)
+            return self.objects
+
+        if len(self.objects) == 0:
+            for c in centroids:
+                self.register(c)
+            return self.objects
+
+        obj_ids = list(self.objects)
+        D = np.array([[np.linalg.norm(np.subtract(oc, cc)) for cc in centroids]
+                      for oc in self.objects.values()])
+
+        # Stable sort: ties are broken by slot order, as in the matcher
+        rows = D.min(axis=1).argsort(kind="stable")
+        cols = D.argmin(axis=1)[rows]
+
+        used_rows: set[int] = set()
+        used_cols: set[int] = set()
+        for row, col in zip(rows, cols):
+            if row in used_rows or col in used_cols or D[row, col] > MAX_MATCH_DIST:
+                continue
+            self.objects[obj_ids[row]] = centroids[col]
+            self.disappeared[obj_ids[row]] = 0
+            used_rows.add(row)
+            used_cols.add(col)
+
+        for row in set(range(len(obj_ids))) - used_rows:
+            obj_id = obj_ids[row]
+            self.disappeared[obj_id] += 1
+            if self.disappeared[obj_id] > self.max_disappeared:
+                self.deregister(obj_id)
+
+        # Sorted: the original iterated the set, so new IDs could come out
+        # in hash order rather than detection order (labels only)
+        for col in sorted(set(range(len(centroids))) - used_cols):
+            self.register(centroids[col])
+
+        return self.objects
+
+
+class ReferenceCounter:
+    """The per-object counting loop detect.py used before LineCounter."""
+
+    def __init__(self, line_y: int):
+        self.line_y = line_y
+        self.counted_ids: set[int] = set()
+        self.prev_positions: dict[int, int] = {}
+
+    def update(self, objects: dict[int, tuple[int, int]]) -> int:
+        line_y = self.line_y
+        crossings = 0
+        for obj_id, (cx, cy) in objects.items():
+            if obj_id in self.counted_ids:
+                continue
+            prev_y = self.prev_positions.get(obj_id)
+            if prev_y is not None and ((prev_y < line_y <= cy) or (prev_y > line_y >= cy)):
+                crossings += 1
+                self.counted_ids.add(obj_id)
+            self.prev_positions[obj_id] = cy
+
+        for obj_id in list(self.prev_positions):
+            if obj_id not in objects:
+                del self.prev_positions[obj_id]
+        return crossings
+
+
+def _run_both(frames, max_disappeared: int, line_y: int, capacity: int = 64):
+    """Feed the same frames to both implementations and compare after each one."""
+    ref_tracker, ref_counter = ReferenceTracker(max_disappeared), ReferenceCounter(line_y)
+    tracker = CentroidTracker(max_disappeared=max_disappeared, capacity=capacity)
+    counter = LineCounter(line_y)
+    ref_total = total = 0
+    for centroids in frames:
+        ref_total += ref_counter.update(ref_tracker.update(centroids))
+        tracker.update(np.array(centroids, dtype=np.int32).reshape(-1, 2))
+        total += counter.update(tracker)
+        assert tracker.objects == ref_tracker.objects
+        assert total == ref_total
+    return tracker, total
+
+
+def _conveyor_frames(rng: np.random.Generator, n_frames: int, dropout: float):
+    """Items moving down a 1080-px belt at random speeds, with missed detections."""
+    items = [(int(rng.integers(0, n_frames)), int(rng.integers(0, 1920)), int(rng.integers(5, 40)))
+             for _ in range(40)]
+    frames = []
+    for f in range(n_frames):
+        centroids = []
+        for start, x, speed in items:
+            y = (f - start) * speed
+            if 0 <= y < 1080 and rng.random() >= dropout:
+                centroids.append((x + int(rng.integers(-3, 4)), y))
+        frames.append(centroids)
+    return frames
+
+
+def test_matches_reference_on_conveyor_tracks():
+    for seed in range(5):
+        for dropout in (0.0, 0.3, 0.6):
+            rng = np.random.default_rng(seed)
+            _run_both(_conveyor_frames(rng, 300, dropout), max_disappeared=5, line_y=540)
+
+
+def test_matches_reference_on_random_detections():
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        frames = [[(int(x), int(y)) for x, y in rng.integers(0, 300, (rng.integers(0, 8), 2))]
+                  for _ in range(40)]
+        _run_both(frames, max_disappeared=3, line_y=150, capacity=2)
+
+
+def test_slot_reused_within_one_update():
+    # The first object drops out in the same update that registers the
+    # second, which takes over its slot on the other side of the line.
+    tracker, total = _run_both([[(10, 10)], [(500, 500)]], max_disappeared=0, line_y=100,
+                               capacity=1)
+    assert len(tracker.live) == 1
+    assert tracker.ids[0] == 1
+    assert total == 0
+
+
+def test_grow_keeps_counter_state():
+    frames = [[(100, 80)],
+              [(100, 90), (300, 60), (500, 10), (700, 10)],  # grows from 1 to 4 slots
+              [(100, 110), (300, 90), (500, 20), (700, 20)],
+              [(100, 120), (300, 120), (500, 30), (700, 30), (900, 10)]]  # grows to 8
+    tracker, total = _run_both(frames, max_disappeared=2, line_y=100, capacity=1)
+    assert len(tracker.live) == 8
+    assert total == 2
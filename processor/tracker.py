@@ -0,0 +1,184 @@
+"""
+Centroid tracking and line-crossing counting for the conveyor counter.
+
+Pure Python + NumPy; the matching step lives in assign.py.
+"""
+
+import numpy as np
+
+from assign import compute_assignments
+
+
+MAX_MATCH_DIST = 80  # max distance (pixels) between a track and its new detection
+
+
+# ---------------------------------------------------------------------------
+# Tracker – simple centroid tracker to avoid double-counting
+# ---------------------------------------------------------------------------
+class CentroidTracker:
+    """Track objects by centroid proximity across frames.
+
+    State is stored as parallel arrays indexed by slot (centroid, id,
+    disappeared count, live flag) so update() can pass the live centroids
+    to the matcher directly instead of rebuilding lists every frame.
+
+    Only objects missing for at most max_stale updates are matched against
+    new detections; staler ones just age out, keeping matching cost
+    proportional to the active objects. max_stale defaults to
+    max_disappeared, i.e. no pruning: an object that is never matched again
+    reappears under a new ID with no previous position, so its line
+    crossing is lost. Lower it only where that trade-off is acceptable.
+    """
+
+    def __init__(self, max_disappeared: int = 15, max_distance: float = MAX_MATCH_DIST,
+                 max_stale: int | None = None, capacity: int = 64):
+        self.next_id = 0
+        self.max_disappeared = max_disappeared
+        self.max_distance = max_distance
+        self.max_stale = max_disappeared if max_stale is None else max_stale
+        self._xy = np.zeros((capacity, 2), dtype=np.float32)
+        self._id = np.empty(capacity, dtype=np.int32)
+        self._dis = np.empty(capacity, dtype=np.int32)
+        self._live = np.zeros(capacity, dtype=bool)
+
+    @property
+    def objects(self) -> dict[int, tuple[int, int]]:
+        """Tracked objects as {obj_id: (cx, cy)}."""
+        return {int(self._id[slot]): (int(self._xy[slot, 0]), int(self._xy[slot, 1]))
+                for slot in np.flatnonzero(self._live)}
+
+    # Read-only views of the slot arrays; only entries where live is True
+    # hold an object.
+    @property
+    def live(self) -> np.ndarray:
+        return self._live
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._id
+
+    @property
+    def xy(self) -> np.ndarray:
+        return self._xy
+
+    def _grow(self):
+        extra = len(self._live)
+        self._xy = np.concatenate([self._xy, np.zeros((extra, 2), dtype=np.float32)])
+        self._id = np.concatenate([self._id, np.empty(extra, dtype=np.int32)])
+        self._dis = np.concatenate([self._dis, np.empty(extra, dtype=np.int32)])
+        self._live = np.concatenate([self._live, np.zeros(extra, dtype=bool)])
+
+    def register(self, centroid: np.ndarray | tuple[int, int]) -> int:
+        slot = int(np.argmin(self._live))  # first free slot
+        if self._live[slot]:
+            slot = len(self._live)
+            self._grow()
+        obj_id = self.next_id
+        self._xy[slot] = centroid
+        self._id[slot] = obj_id
+        self._dis[slot] = 0
+        self._live[slot] = True
+        self.next_id += 1
+        return obj_id
+
+    def deregister(self, obj_id: int):
+        self._live &= self._id != obj_id
+
+    def _age(self, slots: np.ndarray):
+        """Mark objects as disappeared; drop them after max_disappeared updates."""
+        self._dis[slots] += 1
+        self._live[slots] = self._dis[slots] <= self.max_disappeared
+
+    def update(self, centroids: np.ndarray | list[tuple[int, int]]):
+        """Match one frame's detections against the tracked objects.
+
+        Frames must be fed one at a time: each frame is matched against the
+        positions left by the previous update, so the distance computations
+        of several frames cannot be batched into one call.
+        """
+        # No detections – mark all existing as disappeared
+        if len(centroids) == 0:
+            self._age(np.flatnonzero(self._live))
+            return
+
+        # Stale objects skip matching and just age; live objects are never
+        # missing for more than max_disappeared updates, so by default there
+        # is nothing to filter.
+        slots = np.flatnonzero(self._live)
+        if self.max_stale < self.max_disappeared:
+            is_active = self._dis[slots] <= self.max_stale
+            self._age(slots[~is_active])
+            slots = slots[is_active]
+
+        # No active objects – register all
+        if len(slots) == 0:
+            for c in centroids:
+                self.register(c)
+            return
+
+        new_arr = np.asarray(centroids, dtype=np.float32)
+
+        rows, cols = compute_assignments(self._xy[slots], new_arr,
+                                         float(self.max_distance ** 2))
+
+        matched = slots[rows]
+        self._xy[matched] = new_arr[cols]
+        self._dis[matched] = 0
+
+        used_rows = np.zeros(len(slots), dtype=bool)
+        used_cols = np.zeros(len(centroids), dtype=bool)
+        used_rows[rows] = True
+        used_cols[cols] = True
+
+        self._age(slots[~used_rows])
+
+        for col in np.flatnonzero(~used_cols):
+            self.register(centroids[col])
+
+
+# ---------------------------------------------------------------------------
+# Counter – tracked objects crossing the counting line
+# ---------------------------------------------------------------------------
+def _pad(arr: np.ndarray, size: int, fill) -> np.ndarray:
+    return np.concatenate([arr, np.full(size - len(arr), fill, dtype=arr.dtype)])
+
+
+class LineCounter:
+    """Count tracked objects crossing a horizontal line, once per object.
+
+    The previous y and counted flag of each object are kept in arrays
+    aligned with the tracker's slots, so a whole update is a few vector
+    operations.
+    """
+
+    def __init__(self, line_y: int):
+        self.line_y = line_y
+        self._slot_id = np.empty(0, dtype=np.int32)  # object each slot's state belongs to
+        self._prev_y = np.empty(0, dtype=np.int32)
+        self._counted = np.empty(0, dtype=bool)
+
+    def update(self, tracker: CentroidTracker) -> int:
+        """Record the tracker's latest positions; return the number of new crossings."""
+        live, ids = tracker.live, tracker.ids
+        curr_y = tracker.xy[:, 1].astype(np.int32)
+        if len(live) > len(self._counted):
+            self._slot_id = _pad(self._slot_id, len(live), -1)
+            self._prev_y = _pad(self._prev_y, len(live), -1)
+            self._counted = _pad(self._counted, len(live), False)
+        slot_id, prev_y, counted = self._slot_id, self._prev_y, self._counted
+
+        # Slots taken by a new object start without a previous position
+        fresh = live & (slot_id != ids)
+        slot_id[fresh] = ids[fresh]
+        prev_y[fresh] = -1
+        counted[fresh] = False
+
+        # Crossed the line since the last update (either direction)
+        line_y = self.line_y
+        crossed = live & (prev_y >= 0) & (
+            ((prev_y < line_y) & (curr_y >= line_y)) | ((prev_y > line_y) & (curr_y <= line_y)))
+        crossed_new = crossed & ~counted
+        counted |= crossed_new
+
+        prev_y[live] = curr_y[live]
+        return int(crossed_new.sum())